@@ -1,10 +1,19 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from cachetools import TTLCache
+import orjson
 import sqlite3
-from typing import List
+import queue
+import threading
+import hashlib
+from contextlib import contextmanager
+from typing import List, Optional
 from pydantic import BaseModel
 import os
 
-# Pydantic model for response data
+# Pydantic model for response data. Only used to document the responses in
+# OpenAPI; endpoints return dicts built from trusted DB rows, never validated
 class Product(BaseModel):
     id: int
     name: str
@@ -12,18 +21,201 @@ class Product(BaseModel):
     stock: int
 
 # Initialize FastAPI app
+# Endpoints return plain dicts built from DB rows; orjson serializes them
+# without a pass through jsonable_encoder
 app = FastAPI(
     title="Ski Products API",
     description="Simple API for ski products - returns only id, name, price and stock",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Database connection helper
-def get_db_connection():
-    db_path = os.path.join(os.path.dirname(__file__), 'data', 'ski_products.db')
-    if not os.path.exists(db_path):
+# Database connection pool
+DB_PATH = os.path.join(os.path.dirname(__file__), 'data', 'ski_products.db')
+POOL_SIZE = 4
+
+# Per-connection tuning: WAL lets readers run alongside the Excel sync, and a
+# large page cache / mmap keeps hot pages warm across requests
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+"""
+
+# Pool of long-lived connections, opened on startup or first use. _pool_ino
+# is the inode of the file it was opened on: sqllite_db.py replaces the file,
+# and connections to the unlinked old file would keep serving stale rows
+_pool: Optional[queue.Queue] = None
+_pool_ino: Optional[int] = None
+_pool_lock = threading.Lock()
+
+def open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
+
+def db_inode() -> Optional[int]:
+    try:
+        return os.stat(DB_PATH).st_ino
+    except FileNotFoundError:
+        return None
+
+def current_pool() -> Optional[queue.Queue]:
+    # Return a pool for the current database file, (re)opening it when the
+    # file appeared or was replaced since the pool was opened
+    global _pool, _pool_ino
+    ino = db_inode()
+    if _pool is not None and ino == _pool_ino:
+        return _pool
+    with _pool_lock:
+        ino = db_inode()
+        if _pool is not None and ino == _pool_ino:
+            return _pool
+        # The old pool is dropped, not drained, so requests already holding
+        # it can still borrow; its connections close when it is collected
+        _pool, _pool_ino = None, None
+        if ino is None:
+            return None
+        pool = queue.Queue(maxsize=POOL_SIZE)
+        for _ in range(POOL_SIZE):
+            pool.put(open_connection())
+        _pool, _pool_ino = pool, ino
+        return pool
+
+@app.on_event("startup")
+def open_pool():
+    # A missing database is not fatal; the pool opens once the file exists
+    current_pool()
+
+@app.on_event("shutdown")
+def close_pool():
+    global _pool, _pool_ino
+    with _pool_lock:
+        pool, _pool, _pool_ino = _pool, None, None
+    if pool is None:
+        return
+    while not pool.empty():
+        pool.get_nowait().close()
+
+# Borrow a pooled connection for the duration of a request
+@contextmanager
+def acquire():
+    pool = current_pool()
+    if pool is None:
         raise HTTPException(status_code=500, detail="Database not found. Please run create_database.py first.")
-    return sqlite3.connect(db_path)
+    conn = pool.get()
+    try:
+        yield conn
+    finally:
+        pool.put(conn)
+
+# Run one query on a pooled connection. Blocking, so endpoints call it
+# through run_in_threadpool to keep the event loop free
+def fetch_one(sql: str, params: tuple):
+    with acquire() as conn:
+        return conn.execute(sql, params).fetchone()
+
+# Queries. Kept as module constants so every call passes the same SQL text
+# and hits the connection's prepared-statement cache
+SQL_GET_ALL = """
+    SELECT p.id, p.name, p.price, i.stock_quantity
+    FROM products p
+    JOIN inventory i ON p.id = i.product_id
+    WHERE p.is_active = 1
+    ORDER BY p.id
+"""
+SQL_GET_PRODUCT = """
+    SELECT p.id, p.name, p.price, i.stock_quantity
+    FROM products p
+    JOIN inventory i ON p.id = i.product_id
+    WHERE p.id = ? AND p.is_active = 1
+"""
+SQL_GET_NAME = "SELECT name FROM products WHERE id = ? AND is_active = 1"
+SQL_GET_PRICE = "SELECT price FROM products WHERE id = ? AND is_active = 1"
+SQL_GET_STOCK = (
+    "SELECT stock_quantity FROM inventory WHERE product_id = ? "
+    "AND EXISTS (SELECT 1 FROM products WHERE id = ? AND is_active = 1)"
+)
+
+# Read-through cache for product lookups, keyed by product id plus one key
+# for the serialized product list. Entries expire after CACHE_TTL_SECONDS.
+# The cache lives in each worker process, so every worker also clears it
+# whenever the database files change on disk (see check_cache)
+CACHE_TTL_SECONDS = 60
+ALL_PRODUCTS_KEY = "all"
+_cache = TTLCache(maxsize=1024, ttl=CACHE_TTL_SECONDS)
+_cache_signature = None
+
+def db_signature():
+    # Identity, mtime and size of the database and its WAL. A commit from any
+    # process (the Excel sync) appends to the WAL, a checkpoint rewrites the
+    # main file and sqllite_db.py replaces it, so each of these changes it
+    signature = []
+    for path in (DB_PATH, DB_PATH + "-wal"):
+        try:
+            st = os.stat(path)
+            signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+def check_cache():
+    # Drop entries cached before the database last changed. Two stats per
+    # request; a write landing within one filesystem timestamp tick of the
+    # previous check without growing the WAL can be missed, in which case the
+    # TTL still bounds how long the stale entry is served
+    global _cache_signature
+    signature = db_signature()
+    if signature != _cache_signature:
+        _cache.clear()
+        _cache_signature = signature
+
+def store_cached(key, value, signature):
+    # Store a value loaded after check_cache returned signature. If another
+    # request saw the database change while the load awaited, the value may
+    # hold rows from before the change and is left uncached
+    if _cache_signature == signature:
+        _cache[key] = value
+
+# Query and serialize the full product list as (json bytes, etag). Blocking;
+# callers store the result in _cache from the event loop
+def load_all_products():
+    with acquire() as conn:
+        rows = conn.execute(SQL_GET_ALL).fetchall()
+    
+    blob = orjson.dumps([
+        {"id": row[0], "name": row[1], "price": row[2], "stock": row[3]}
+        for row in rows
+    ])
+    return blob, f'"{hashlib.md5(blob).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match is "*" or a comma-separated list of tags, each possibly
+    # weak (W/"..."); weak comparison applies, so the W/ prefix is ignored
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+# Pre-build the product list on startup and after each invalidation
+@app.on_event("startup")
+async def warm_cache():
+    if db_inode() is None:
+        return
+    check_cache()
+    signature = _cache_signature
+    try:
+        store_cached(ALL_PRODUCTS_KEY, await run_in_threadpool(load_all_products), signature)
+    except sqlite3.Error:
+        # Leave the cache cold; /products reports the error per request
+        pass
 
 # Root endpoint
 @app.get("/")
@@ -31,66 +223,43 @@ async def root():
     return {"message": "Ski Products API - Returns id, name, price, stock only"}
 
 # Get all products
-@app.get("/products", response_model=List[Product])
-async def get_all_products():
+@app.get("/products", responses={200: {"model": List[Product]}})
+async def get_all_products(if_none_match: Optional[str] = Header(None)):
     """Get all products with id, name, price and stock"""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                p.id,
-                p.name,
-                p.price,
-                i.stock_quantity
-            FROM products p
-            JOIN inventory i ON p.id = i.product_id
-            WHERE p.is_active = 1
-            ORDER BY p.id
-        """
-        
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        conn.close()
-        
-        products = [
-            Product(id=row[0], name=row[1], price=row[2], stock=row[3])
-            for row in rows
-        ]
-        
-        return products
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    check_cache()
+    signature = _cache_signature
+    entry = _cache.get(ALL_PRODUCTS_KEY)
+    if entry is None:
+        try:
+            entry = await run_in_threadpool(load_all_products)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        store_cached(ALL_PRODUCTS_KEY, entry, signature)
+    
+    blob, etag = entry
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=blob, media_type="application/json", headers={"ETag": etag})
 
 # Get product by ID
-@app.get("/products/{product_id}", response_model=Product)
+@app.get("/products/{product_id}", responses={200: {"model": Product}})
 async def get_product_by_id(product_id: int):
     """Get product by ID - returns id, name, price and stock"""
+    check_cache()
+    signature = _cache_signature
+    product = _cache.get(product_id)
+    if product is not None:
+        return product
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                p.id,
-                p.name,
-                p.price,
-                i.stock_quantity
-            FROM products p
-            JOIN inventory i ON p.id = i.product_id
-            WHERE p.id = ? AND p.is_active = 1
-        """
-        
-        cursor.execute(query, (product_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await run_in_threadpool(fetch_one, SQL_GET_PRODUCT, (product_id,))
         
         if not row:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
         
-        product = Product(id=row[0], name=row[1], price=row[2], stock=row[3])
+        product = {"id": row[0], "name": row[1], "price": row[2], "stock": row[3]}
+        store_cached(product_id, product, signature)
         return product
         
     except HTTPException:
@@ -103,12 +272,7 @@ async def get_product_by_id(product_id: int):
 async def get_product_name(product_id: int):
     """Get just the product name by ID"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT name FROM products WHERE id = ? AND is_active = 1", (product_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await run_in_threadpool(fetch_one, SQL_GET_NAME, (product_id,))
         
         if not row:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
@@ -125,12 +289,7 @@ async def get_product_name(product_id: int):
 async def get_product_price(product_id: int):
     """Get just the product price by ID"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT price FROM products WHERE id = ? AND is_active = 1", (product_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await run_in_threadpool(fetch_one, SQL_GET_PRICE, (product_id,))
         
         if not row:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
@@ -147,19 +306,7 @@ async def get_product_price(product_id: int):
 async def get_product_stock(product_id: int):
     """Get just the product stock by ID"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT i.stock_quantity
-            FROM inventory i
-            JOIN products p ON i.product_id = p.id
-            WHERE p.id = ? AND p.is_active = 1
-        """
-        
-        cursor.execute(query, (product_id,))
-        row = cursor.fetchone()
-        conn.close()
+        row = await run_in_threadpool(fetch_one, SQL_GET_STOCK, (product_id, product_id))
         
         if not row:
             raise HTTPException(status_code=404, detail=f"Product with ID {product_id} not found")
@@ -171,6 +318,27 @@ async def get_product_stock(product_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+# Drop cached products in the worker that receives the request, called by
+# excelTosql.py after a sync. Other workers pick up the change through
+# check_cache on their next cached read
+@app.post("/cache/invalidate")
+async def invalidate_cache():
+    """Clear the product cache so the next reads go to the database"""
+    _cache.clear()
+    await warm_cache()
+    return {"message": "Product cache cleared"}
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, port=8000)
\ No newline at end of file
+    # One worker per core; each keeps its own cache and notices database
+    # changes through check_cache. loop/http "auto" pick uvloop and httptools
+    # when installed (uvicorn[standard]). Access logging is off for throughput
+    uvicorn.run(
+        "apicalls:app",
+        port=8000,
+        workers=os.cpu_count() or 1,
+        loop="auto",
+        http="auto",
+        log_level="warning",
+        access_log=False
+    )
\ No newline at end of file
@@ -3,8 +3,11 @@ import os
 import sys
 import time
 import sqlite3
-from typing import Dict, Optional, Tuple, Iterable
+import threading
+import urllib.request
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 REQUIRED_COLS = ["Id", "ProductName", "Price", "Stock"]
@@ -18,12 +21,21 @@ OPTIONAL_COLS = [
 def load_sheet(path: str) -> pd.DataFrame:
     _, ext = os.path.splitext(path.lower())
     if ext in [".xlsx", ".xls", ".xlsm"]:
+        # Prefer the Rust-backed calamine reader, fall back to openpyxl. pandas before
+        # 2.2 has no calamine engine and rejects the name with a ValueError
         try:
-            df = pd.read_excel(path, sheet_name=0, engine="openpyxl")
-        except ImportError:
-            raise SystemExit("openpyxl is required to read Excel files. Install: pip install openpyxl")
+            df = pd.read_excel(path, sheet_name=0, engine="calamine")
+        except (ImportError, ValueError):
+            try:
+                df = pd.read_excel(path, sheet_name=0, engine="openpyxl")
+            except ImportError:
+                raise SystemExit("python-calamine or openpyxl is required to read Excel files. "
+                                 "Install: pip install python-calamine")
     elif ext == ".csv":
-        df = pd.read_csv(path)
+        try:
+            df = pd.read_csv(path, engine="pyarrow")
+        except ImportError:
+            df = pd.read_csv(path)
     else:
         raise SystemExit(f"Unsupported file extension: {ext}. Use .xlsx or .csv")
     # Normalize columns
@@ -33,9 +45,55 @@ def load_sheet(path: str) -> pd.DataFrame:
         raise SystemExit(f"Missing required columns: {missing}")
     return df
 
+# Sheet column, dimension table and products column of each name -> id lookup
+DIMENSIONS = (
+    ("Category", "categories", "category_id"),
+    ("Brand", "brands", "brand_id"),
+    ("Material", "materials", "material_id"),
+    ("Model", "models", "model_id"),
+    ("Gender", "genders", "gender_id"),
+    ("Level", "skill_levels", "skill_level_id"),
+    ("Color", "colors", "color_id"),
+    ("Season", "seasons", "season_id"),
+)
+
+PRODUCTS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        category_id INTEGER NOT NULL,
+        brand_id INTEGER NOT NULL,
+        model_id INTEGER,
+        gender_id INTEGER,
+        skill_level_id INTEGER,
+        color_id INTEGER,
+        size TEXT,
+        length_cm INTEGER,
+        weight_kg REAL,
+        price REAL NOT NULL CHECK(price > 0),
+        discount_percent INTEGER DEFAULT 0 CHECK(discount_percent >= 0 AND discount_percent <= 100),
+        material_id INTEGER,
+        release_year INTEGER,
+        season_id INTEGER,
+        warranty_months INTEGER DEFAULT 12,
+        sku TEXT UNIQUE,
+        barcode TEXT UNIQUE,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (category_id) REFERENCES categories (id),
+        FOREIGN KEY (brand_id) REFERENCES brands (id),
+        FOREIGN KEY (material_id) REFERENCES materials (id),
+        FOREIGN KEY (model_id) REFERENCES models (id),
+        FOREIGN KEY (gender_id) REFERENCES genders (id),
+        FOREIGN KEY (skill_level_id) REFERENCES skill_levels (id),
+        FOREIGN KEY (color_id) REFERENCES colors (id),
+        FOREIGN KEY (season_id) REFERENCES seasons (id)
+    );
+"""
+
 def ensure_schema(conn: sqlite3.Connection):
     cur = conn.cursor()
-    cur.execute("PRAGMA foreign_keys = ON;")
     # Dimensions and main tables
     cur.executescript("""
     CREATE TABLE IF NOT EXISTS categories (
@@ -58,35 +116,19 @@ def ensure_schema(conn: sqlite3.Connection):
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         name TEXT NOT NULL UNIQUE
     );
+    """)
+    for table in ("models", "genders", "skill_levels", "colors", "seasons"):
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        );
+        """)
+    cur.execute(PRODUCTS_TABLE_SQL.format(table="products"))
+    migrate_text_attributes(conn)
 
-    CREATE TABLE IF NOT EXISTS products (
-        id INTEGER PRIMARY KEY,
-        name TEXT NOT NULL,
-        category_id INTEGER NOT NULL,
-        brand_id INTEGER NOT NULL,
-        model TEXT,
-        gender TEXT,
-        skill_level TEXT,
-        color TEXT,
-        size TEXT,
-        length_cm INTEGER,
-        weight_kg REAL,
-        price REAL NOT NULL CHECK(price > 0),
-        discount_percent INTEGER DEFAULT 0 CHECK(discount_percent >= 0 AND discount_percent <= 100),
-        material_id INTEGER,
-        release_year INTEGER,
-        season TEXT,
-        warranty_months INTEGER DEFAULT 12,
-        sku TEXT UNIQUE,
-        barcode TEXT UNIQUE,
-        is_active INTEGER DEFAULT 1,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (category_id) REFERENCES categories (id),
-        FOREIGN KEY (brand_id) REFERENCES brands (id),
-        FOREIGN KEY (material_id) REFERENCES materials (id)
-    );
-
+    cur.execute("PRAGMA foreign_keys = ON;")
+    cur.executescript("""
     -- Make product_id unique to support UPSERT
     CREATE TABLE IF NOT EXISTS inventory (
         product_id INTEGER PRIMARY KEY,
@@ -117,200 +159,275 @@ def ensure_schema(conn: sqlite3.Connection):
     CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand_id);
     CREATE INDEX IF NOT EXISTS idx_products_price ON products(price);
     CREATE INDEX IF NOT EXISTS idx_products_active ON products(is_active);
+    -- Covers the API's active product list: rows come out in id order without touching the table
+    CREATE INDEX IF NOT EXISTS idx_products_active_covering ON products(is_active, id, name, price);
     """)
-    conn.commit()
 
-def get_or_create_dim(conn: sqlite3.Connection, table: str, name: Optional[str]) -> Optional[int]:
-    if not name or str(name).strip() == "":
-        return None
-    name = str(name).strip()
+def migrate_text_attributes(conn: sqlite3.Connection):
+    # Files written before the attribute lookup tables store model, gender, skill_level,
+    # color and season as text. SQLite cannot retype a column, so the names move into
+    # the lookup tables and products is rebuilt with id columns (foreign keys must be
+    # off while the table is swapped; indexes are recreated by ensure_schema)
     cur = conn.cursor()
-    cur.execute(f"INSERT INTO {table} (name) VALUES (?) ON CONFLICT(name) DO NOTHING;", (name,))
-    conn.commit()
-    cur.execute(f"SELECT id FROM {table} WHERE name = ?;", (name,))
-    row = cur.fetchone()
-    return row[0] if row else None
+    old_columns = [row[1] for row in cur.execute("PRAGMA table_info(products);")]
+    text_columns = {target: (table, target[:-len("_id")]) for _, table, target in DIMENSIONS
+                    if target[:-len("_id")] in old_columns}
+    if not text_columns:
+        return
+    cur.execute("PRAGMA foreign_keys = OFF;")
+    cur.execute("BEGIN IMMEDIATE;")
+    try:
+        cur.execute(PRODUCTS_TABLE_SQL.format(table="products_new"))
+        targets, sources = [], []
+        for column in [row[1] for row in cur.execute("PRAGMA table_info(products_new);")]:
+            if column in text_columns:
+                table, old = text_columns[column]
+                # Names in order of first appearance, like a sync of the same rows
+                cur.execute(f"""
+                    INSERT OR IGNORE INTO {table} (name)
+                    SELECT trim({old}) FROM products WHERE trim({old}) != ''
+                    GROUP BY trim({old}) ORDER BY min(id);
+                """)
+                sources.append(f"(SELECT id FROM {table} WHERE name = trim(products.{old}))")
+            elif column in old_columns:
+                sources.append(column)
+            else:
+                continue
+            targets.append(column)
+        cur.execute(f"INSERT INTO products_new ({', '.join(targets)}) SELECT {', '.join(sources)} FROM products;")
+        cur.execute("DROP TABLE products;")
+        cur.execute("ALTER TABLE products_new RENAME TO products;")
+        violations = cur.execute("PRAGMA foreign_key_check(products);").fetchall()
+        if violations:
+            raise sqlite3.IntegrityError(
+                f"Foreign key check failed for {len(violations)} products (first: {violations[0]})"
+            )
+        cur.execute("COMMIT;")
+    except BaseException:
+        cur.execute("ROLLBACK;")
+        raise
 
-def upsert_product(conn: sqlite3.Connection, row: pd.Series, fk: Dict[str, Optional[int]]):
+def resolve_dims(conn: sqlite3.Connection, table: str, names: pd.Series) -> Dict[str, int]:
+    # Load the table's name -> id map once and insert only the names it lacks
     cur = conn.cursor()
-    # Coerce types/safe defaults
-    def get(col, default=None):
-        return row[col] if col in row and pd.notna(row[col]) else default
-
-    product_id = int(get("Id"))
-    name = str(get("ProductName", f"Product {product_id}"))
-    category_id = fk.get("category_id")
-    brand_id = fk.get("brand_id")
-    material_id = fk.get("material_id")
-    model = get("Model")
-    gender = get("Gender")
-    level = get("Level")
-    color = get("Color")
-    size = get("Size")
-    length_cm = int(get("LengthCm")) if pd.notna(get("LengthCm")) else None
-    weight_kg = float(get("WeightKg")) if pd.notna(get("WeightKg")) else None
-    price = float(get("Price"))
-    discount = int(get("DiscountPercent", 0)) if pd.notna(get("DiscountPercent", 0)) else 0
-    release_year = int(get("ReleaseYear")) if pd.notna(get("ReleaseYear")) else None
-    season = get("Season")
-    warranty_months = int(get("WarrantyMonths", 12)) if pd.notna(get("WarrantyMonths", 12)) else 12
-    sku = str(get("SKU")) if pd.notna(get("SKU")) else None
-    barcode = str(get("Barcode")) if pd.notna(get("Barcode")) else None
-    is_active = get("Active", 1)
-    if isinstance(is_active, str):
-        is_active = 1 if is_active.strip().lower() in ("1", "true", "yes", "y") else 0
-    elif pd.isna(is_active):
-        is_active = 1
-    else:
-        is_active = int(bool(is_active))
-
-    cur.execute("""
-        INSERT INTO products (
-            id, name, category_id, brand_id, model, gender, skill_level, color, size,
-            length_cm, weight_kg, price, discount_percent, material_id, release_year,
-            season, warranty_months, sku, barcode, is_active
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(id) DO UPDATE SET
-            name=excluded.name,
-            category_id=excluded.category_id,
-            brand_id=excluded.brand_id,
-            model=excluded.model,
-            gender=excluded.gender,
-            skill_level=excluded.skill_level,
-            color=excluded.color,
-            size=excluded.size,
-            length_cm=excluded.length_cm,
-            weight_kg=excluded.weight_kg,
-            price=excluded.price,
-            discount_percent=excluded.discount_percent,
-            material_id=excluded.material_id,
-            release_year=excluded.release_year,
-            season=excluded.season,
-            warranty_months=excluded.warranty_months,
-            sku=excluded.sku,
-            barcode=excluded.barcode,
-            is_active=excluded.is_active,
-            updated_at=CURRENT_TIMESTAMP;
-    """, (
-        product_id, name, category_id, brand_id, model, gender, level, color, size,
-        length_cm, weight_kg, price, discount, material_id, release_year,
-        season, warranty_months, sku, barcode, is_active
-    ))
-    conn.commit()
-
-    # Inventory upsert
-    stock_qty = int(get("Stock", 0))
-    reserved_qty = 0
-    reorder_point = 10
-    cur.execute("""
-        INSERT INTO inventory (product_id, stock_quantity, reserved_quantity, reorder_point)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(product_id) DO UPDATE SET
-          stock_quantity=excluded.stock_quantity,
-          reserved_quantity=excluded.reserved_quantity,
-          reorder_point=excluded.reorder_point,
-          last_updated=CURRENT_TIMESTAMP;
-    """, (product_id, stock_qty, reserved_qty, reorder_point))
-
-    # Rating upsert
-    avg_rating = float(get("Rating", 0)) if pd.notna(get("Rating", 0)) else 0.0
-    total_reviews = int(get("TotalReviews", 0)) if pd.notna(get("TotalReviews", 0)) else 0
-    cur.execute("""
-        INSERT INTO product_ratings (product_id, average_rating, total_reviews)
-        VALUES (?, ?, ?)
-        ON CONFLICT(product_id) DO UPDATE SET
-          average_rating=excluded.average_rating,
-          total_reviews=excluded.total_reviews,
-          last_updated=CURRENT_TIMESTAMP;
-    """, (product_id, avg_rating, total_reviews))
-    conn.commit()
-
-def sync_tags(conn: sqlite3.Connection, product_id: int, tags_value: Optional[str]):
-    # Parse tags from "a;b;c" or "a, b, c"
-    tags: Iterable[str] = []
-    if tags_value and isinstance(tags_value, str):
-        if ";" in tags_value:
-            parts = [t.strip() for t in tags_value.split(";")]
-        else:
-            parts = [t.strip() for t in tags_value.split(",")]
-        tags = [t for t in parts if t]
+    ids = {name: dim_id for dim_id, name in cur.execute(f"SELECT id, name FROM {table};")}
+    new = [name for name in names.dropna().unique() if name and name not in ids]
+    if new:
+        cur.executemany(f"INSERT OR IGNORE INTO {table} (name) VALUES (?);", [(name,) for name in new])
+        qmarks = ",".join(["?"] * len(new))
+        cur.execute(f"SELECT id, name FROM {table} WHERE name IN ({qmarks});", new)
+        ids.update((name, dim_id) for dim_id, name in cur.fetchall())
+    return ids
+
+PRODUCT_UPSERT_SQL = """
+    INSERT INTO products (
+        id, name, category_id, brand_id, model_id, gender_id, skill_level_id, color_id, size,
+        length_cm, weight_kg, price, discount_percent, material_id, release_year,
+        season_id, warranty_months, sku, barcode, is_active
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name=excluded.name,
+        category_id=excluded.category_id,
+        brand_id=excluded.brand_id,
+        model_id=excluded.model_id,
+        gender_id=excluded.gender_id,
+        skill_level_id=excluded.skill_level_id,
+        color_id=excluded.color_id,
+        size=excluded.size,
+        length_cm=excluded.length_cm,
+        weight_kg=excluded.weight_kg,
+        price=excluded.price,
+        discount_percent=excluded.discount_percent,
+        material_id=excluded.material_id,
+        release_year=excluded.release_year,
+        season_id=excluded.season_id,
+        warranty_months=excluded.warranty_months,
+        sku=excluded.sku,
+        barcode=excluded.barcode,
+        is_active=excluded.is_active,
+        updated_at=CURRENT_TIMESTAMP;
+"""
+
+INVENTORY_UPSERT_SQL = """
+    INSERT INTO inventory (product_id, stock_quantity, reserved_quantity, reorder_point)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(product_id) DO UPDATE SET
+      stock_quantity=excluded.stock_quantity,
+      reserved_quantity=excluded.reserved_quantity,
+      reorder_point=excluded.reorder_point,
+      last_updated=CURRENT_TIMESTAMP;
+"""
+
+RATING_UPSERT_SQL = """
+    INSERT INTO product_ratings (product_id, average_rating, total_reviews)
+    VALUES (?, ?, ?)
+    ON CONFLICT(product_id) DO UPDATE SET
+      average_rating=excluded.average_rating,
+      total_reviews=excluded.total_reviews,
+      last_updated=CURRENT_TIMESTAMP;
+"""
+
+PRODUCT_COLUMNS = [
+    "id", "name", "category_id", "brand_id", "model_id", "gender_id", "skill_level_id", "color_id", "size",
+    "length_cm", "weight_kg", "price", "discount_percent", "material_id", "release_year",
+    "season_id", "warranty_months", "sku", "barcode", "is_active"
+]
+INVENTORY_COLUMNS = ["id", "stock_quantity", "reserved_quantity", "reorder_point"]
+RATING_COLUMNS = ["id", "average_rating", "total_reviews"]
+
+# Sheet column -> (table column, default for missing cells)
+INT_COLS = {
+    "LengthCm": ("length_cm", None), "ReleaseYear": ("release_year", None),
+    "DiscountPercent": ("discount_percent", 0), "WarrantyMonths": ("warranty_months", 12),
+    "Stock": ("stock_quantity", 0), "TotalReviews": ("total_reviews", 0),
+}
+FLOAT_COLS = {
+    "Price": ("price", None), "WeightKg": ("weight_kg", None), "Rating": ("average_rating", 0.0),
+}
+TEXT_COLS = {"Size": "size", "SKU": "sku", "Barcode": "barcode"}
+ACTIVE_VALUES = {"1": 1, "true": 1, "yes": 1, "y": 1}
+
+def sheet_column(df: pd.DataFrame, col: str) -> pd.Series:
+    # Optional columns that are absent read as all-missing
+    return df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+def dim_names(df: pd.DataFrame, col: str) -> pd.Series:
+    names = sheet_column(df, col)
+    return names.where(names.isna(), names.astype(str).str.strip())
+
+def active_flags(values: pd.Series) -> pd.Series:
+    # Text is matched against ACTIVE_VALUES, other values by truthiness, missing means active.
+    # The .str chain only runs on the text cells; numeric columns have no .str accessor
+    text = values.map(lambda v: isinstance(v, str)).astype(bool)
+    flags = values[text].astype(str).str.strip().str.lower().map(ACTIVE_VALUES).fillna(0)
+    others = values[~text].astype(object)
+    truthy = others.where(others.notna(), True).astype(bool)
+    return pd.concat([flags, truthy]).reindex(values.index).astype(int)
+
+def normalize_sheet(df: pd.DataFrame, fk: Dict[str, pd.Series]) -> pd.DataFrame:
+    # Coerce each sheet column once into its table column, with safe defaults
+    out = pd.DataFrame(index=df.index)
+    out["id"] = pd.to_numeric(df["Id"]).astype("int64")
+    names = sheet_column(df, "ProductName")
+    out["name"] = names.astype(str).where(names.notna(), "Product " + out["id"].astype(str))
+    for col, (target, default) in INT_COLS.items():
+        values = np.trunc(pd.to_numeric(sheet_column(df, col), errors="coerce")).astype("Int64")
+        out[target] = values if default is None else values.fillna(default)
+    for col, (target, default) in FLOAT_COLS.items():
+        values = pd.to_numeric(sheet_column(df, col), errors="coerce").astype("Float64")
+        out[target] = values if default is None else values.fillna(default)
+    for col, target in TEXT_COLS.items():
+        values = sheet_column(df, col)
+        out[target] = values.where(values.isna(), values.astype(str))
+    out["is_active"] = active_flags(sheet_column(df, "Active"))
+    out["reserved_quantity"] = 0
+    out["reorder_point"] = 10
+    for target, ids in fk.items():
+        out[target] = ids.astype("Int64")
+    # Plain Python values with None for missing cells, ready for sqlite3
+    out = out.astype(object)
+    return out.where(out.notna(), None)
+
+def table_rows(rows: pd.DataFrame, columns: List[str]) -> List[tuple]:
+    # Zip whole columns into parameter tuples; much cheaper than itertuples on object columns
+    return list(zip(*(rows[col].tolist() for col in columns)))
+
+def parse_tags(ids: pd.Series, tags: pd.Series) -> pd.DataFrame:
+    # Long (product_id, tag) frame from "a;b;c" or "a, b, c" cells, in sheet order
+    text = tags.where(tags.map(lambda v: isinstance(v, str)), "")
+    semicolon = text.str.contains(";", regex=False)
+    parts = text.str.split(";").where(semicolon, text.str.split(","))
+    links = pd.DataFrame({"product_id": ids, "tag": parts, "last": ~ids.duplicated(keep="last")}).explode("tag")
+    links["tag"] = links["tag"].str.strip()
+    return links[links["tag"].notna() & (links["tag"] != "")]
+
+def sync_tags(conn: sqlite3.Connection, product_ids: List[int], links: pd.DataFrame):
     cur = conn.cursor()
-    # Insert tags (ignore existing)
-    tag_ids = []
-    for t in tags:
-        cur.execute("INSERT INTO tags (name) VALUES (?) ON CONFLICT(name) DO NOTHING;", (t,))
-        cur.execute("SELECT id FROM tags WHERE name = ?;", (t,))
-        r = cur.fetchone()
-        if r:
-            tag_ids.append(r[0])
-    # Ensure links
-    for tid in tag_ids:
-        cur.execute("INSERT OR IGNORE INTO product_tags (product_id, tag_id) VALUES (?, ?);", (product_id, tid))
-    # Remove links that are no longer present
-    if tag_ids:
-        cur.execute(
-            f"DELETE FROM product_tags WHERE product_id = ? AND tag_id NOT IN ({','.join(['?']*len(tag_ids))});",
-            (product_id, *tag_ids)
-        )
-    else:
-        cur.execute("DELETE FROM product_tags WHERE product_id = ?;", (product_id,))
-    conn.commit()
+    # Insert tags (ignore existing), in order of first appearance
+    cur.executemany("INSERT INTO tags (name) VALUES (?) ON CONFLICT(name) DO NOTHING;",
+                    [(t,) for t in links["tag"].unique()])
+    tag_ids = {name: tid for tid, name in cur.execute("SELECT id, name FROM tags;")}
+    # Replace the links of every synced product, the last row for an Id wins
+    ids = list(dict.fromkeys(product_ids))
+    qmarks = ",".join(["?"] * len(ids))
+    cur.execute(f"DELETE FROM product_tags WHERE product_id IN ({qmarks});", ids)
+    latest = links[links["last"]]
+    cur.executemany(
+        "INSERT OR IGNORE INTO product_tags (product_id, tag_id) VALUES (?, ?);",
+        zip(latest["product_id"].tolist(), latest["tag"].map(tag_ids).tolist())
+    )
+
+def notify_cache_invalidation(url: str):
+    # Tell a running API to drop its cached products; a failure here must not fail the sync
+    try:
+        req = urllib.request.Request(url, method="POST")
+        with urllib.request.urlopen(req, timeout=5):
+            pass
+    except OSError as e:
+        print(f"Warning: could not invalidate API cache at {url}: {e}")
 
-def sync_excel_to_sqlite(excel_path: str, db_path: str, purge_missing: bool = False):
+def sync_excel_to_sqlite(excel_path: str, db_path: str, purge_missing: bool = False,
+                         invalidate_url: Optional[str] = None):
     df = load_sheet(excel_path)
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: the driver issues no implicit BEGINs, transactions are explicit below
+    conn = sqlite3.connect(db_path, isolation_level=None)
     try:
+        # The sync is rerunnable from the sheet, so trade durability for load speed
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=OFF;")
         ensure_schema(conn)
 
-        # Dimension caches (name -> id)
-        cat_cache: Dict[str, int] = {}
-        brand_cache: Dict[str, int] = {}
-        mat_cache: Dict[str, int] = {}
-
-        # Upsert rows
-        seen_product_ids = set()
-        for _, r in df.iterrows():
-            # Dimensions
-            cat_name = str(r["Category"]).strip() if "Category" in r and pd.notna(r["Category"]) else None
-            brand_name = str(r["Brand"]).strip() if "Brand" in r and pd.notna(r["Brand"]) else None
-            mat_name = str(r["Material"]).strip() if "Material" in r and pd.notna(r["Material"]) else None
-
-            if cat_name not in cat_cache:
-                cat_cache[cat_name] = get_or_create_dim(conn, "categories", cat_name) if cat_name else None
-            if brand_name not in brand_cache:
-                brand_cache[brand_name] = get_or_create_dim(conn, "brands", brand_name) if brand_name else None
-            if mat_name not in mat_cache:
-                mat_cache[mat_name] = get_or_create_dim(conn, "materials", mat_name) if mat_name else None
-
-            fk = {
-                "category_id": cat_cache.get(cat_name),
-                "brand_id": brand_cache.get(brand_name),
-                "material_id": mat_cache.get(mat_name),
-            }
-
-            upsert_product(conn, r, fk)
-
-            pid = int(r["Id"])
-            seen_product_ids.add(pid)
+        # Everything below is one write transaction: committed on success, rolled back on error.
+        # IMMEDIATE takes the write lock up front rather than failing mid-sync
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            # Dimensions (name -> id)
+            fk = {}
+            for col, table, target in DIMENSIONS:
+                names = dim_names(df, col)
+                fk[target] = names.map(resolve_dims(conn, table, names))
+
+            # Collect parameter rows; executemany applies them in sheet order, so a
+            # repeated Id still ends up with its last row
+            rows = normalize_sheet(df, fk)
+            product_rows = table_rows(rows, PRODUCT_COLUMNS)
+            inventory_rows = table_rows(rows, INVENTORY_COLUMNS)
+            rating_rows = table_rows(rows, RATING_COLUMNS)
 
             # Tags
-            tags_val = r["Tags"] if "Tags" in r else None
-            sync_tags(conn, pid, tags_val)
+            tag_links = parse_tags(df["Id"].astype("int64"), sheet_column(df, "Tags"))
 
-        # Optionally mark products missing from Excel as inactive
-        if purge_missing:
+            # Upsert rows
             cur = conn.cursor()
-            cur.execute("SELECT id FROM products;")
-            existing_ids = {row[0] for row in cur.fetchall()}
-            missing_ids = list(existing_ids - seen_product_ids)
-            if missing_ids:
-                qmarks = ",".join(["?"] * len(missing_ids))
-                cur.execute(f"UPDATE products SET is_active = 0, updated_at=CURRENT_TIMESTAMP WHERE id IN ({qmarks});", missing_ids)
-                conn.commit()
+            cur.executemany(PRODUCT_UPSERT_SQL, product_rows)
+            cur.executemany(INVENTORY_UPSERT_SQL, inventory_rows)
+            cur.executemany(RATING_UPSERT_SQL, rating_rows)
+            sync_tags(conn, [row[0] for row in product_rows], tag_links)
+
+            # Optionally mark products missing from Excel as inactive
+            if purge_missing:
+                seen_product_ids = {row[0] for row in product_rows}
+                cur.execute("SELECT id FROM products;")
+                existing_ids = {row[0] for row in cur.fetchall()}
+                missing_ids = list(existing_ids - seen_product_ids)
+                if missing_ids:
+                    qmarks = ",".join(["?"] * len(missing_ids))
+                    cur.execute(f"UPDATE products SET is_active = 0, updated_at=CURRENT_TIMESTAMP WHERE id IN ({qmarks});", missing_ids)
+            conn.execute("COMMIT;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+
+        # Refresh planner statistics so the API queries pick up the indexes
+        conn.execute("ANALYZE;")
     finally:
         conn.close()
 
-def watch_and_sync(excel_path: str, db_path: str, purge_missing: bool, interval: float = 2.0):
+    if invalidate_url:
+        notify_cache_invalidation(invalidate_url)
+
+def poll_and_sync(excel_path: str, db_path: str, purge_missing: bool, interval: float = 2.0,
+                  invalidate_url: Optional[str] = None):
     last_mtime = None
     print(f"Watching {excel_path} for changes. Press Ctrl+C to stop.")
     while True:
@@ -318,7 +435,8 @@ def watch_and_sync(excel_path: str, db_path: str, purge_missing: bool, interval:
             mtime = os.path.getmtime(excel_path)
             if last_mtime is None or mtime != last_mtime:
                 print("Change detected. Syncing...")
-                sync_excel_to_sqlite(excel_path, db_path, purge_missing=purge_missing)
+                sync_excel_to_sqlite(excel_path, db_path, purge_missing=purge_missing,
+                                     invalidate_url=invalidate_url)
                 print("Sync complete.")
                 last_mtime = mtime
         except KeyboardInterrupt:
@@ -330,6 +448,65 @@ def watch_and_sync(excel_path: str, db_path: str, purge_missing: bool, interval:
             print(f"Error: {e}")
         time.sleep(interval)
 
+def watch_and_sync(excel_path: str, db_path: str, purge_missing: bool, interval: float = 2.0,
+                   invalidate_url: Optional[str] = None, debounce: float = 0.3):
+    # React to filesystem events instead of polling; fall back to polling without watchdog
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        poll_and_sync(excel_path, db_path, purge_missing, interval=interval, invalidate_url=invalidate_url)
+        return
+
+    excel_path = os.path.abspath(excel_path)
+    sync_lock = threading.Lock()
+    pending: List[threading.Timer] = []
+
+    def run_sync():
+        with sync_lock:
+            try:
+                print("Change detected. Syncing...")
+                sync_excel_to_sqlite(excel_path, db_path, purge_missing=purge_missing,
+                                     invalidate_url=invalidate_url)
+                print("Sync complete.")
+            except FileNotFoundError:
+                print("File not found. Waiting...")
+            except Exception as e:
+                print(f"Error: {e}")
+
+    def schedule_sync():
+        # Excel saves as several events (temp file, rename); coalesce them into one sync
+        for timer in pending:
+            timer.cancel()
+        timer = threading.Timer(debounce, run_sync)
+        pending[:] = [timer]
+        timer.start()
+
+    class ExcelChangeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Reads (including our own) also raise open/close events; only writes count
+            if event.is_directory or event.event_type not in ("created", "modified", "moved", "closed"):
+                return
+            paths = (event.src_path, getattr(event, "dest_path", ""))
+            if any(p and os.path.abspath(p) == excel_path for p in paths):
+                schedule_sync()
+
+    observer = Observer()
+    observer.schedule(ExcelChangeHandler(), os.path.dirname(excel_path), recursive=False)
+    observer.start()
+    print(f"Watching {excel_path} for changes. Press Ctrl+C to stop.")
+    run_sync()
+    try:
+        while observer.is_alive():
+            observer.join(1)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        for timer in pending:
+            timer.cancel()
+        observer.stop()
+        observer.join()
+
 def main():
     parser = argparse.ArgumentParser(description="Sync Excel/CSV skiing products into a normalized SQLite database.")
     parser.add_argument("--excel", required=True, help="Path to input Excel (.xlsx) or CSV file")
@@ -338,14 +515,18 @@ def main():
     parser.add_argument("--purge-missing", action="store_true",
                         help="Mark products not present in the Excel as inactive")
     parser.add_argument("--watch", action="store_true", help="Watch the Excel file and auto-sync on changes")
+    parser.add_argument("--invalidate-url", default=None,
+                        help="API endpoint to POST to after each sync, e.g. http://127.0.0.1:8000/cache/invalidate")
     args = parser.parse_args()
 
     os.makedirs(os.path.dirname(args.db), exist_ok=True)
 
     if args.watch:
-        watch_and_sync(args.excel, args.db, purge_missing=args.purge_missing)
+        watch_and_sync(args.excel, args.db, purge_missing=args.purge_missing,
+                       invalidate_url=args.invalidate_url)
     else:
-        sync_excel_to_sqlite(args.excel, args.db, purge_missing=args.purge_missing)
+        sync_excel_to_sqlite(args.excel, args.db, purge_missing=args.purge_missing,
+                             invalidate_url=args.invalidate_url)
         print(f"Synced {args.excel} -> {args.db}")
 
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
+import numpy as np
 import pandas as pd
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 
 def generate_ski_products_excel():
-    # Set seed for reproducible data
-    random.seed(20250929)
+    # Seeded generator for reproducible data
+    rng = np.random.default_rng(20250929)
     
     # Product data arrays
     categories = [
@@ -32,154 +32,153 @@ def generate_ski_products_excel():
     materials = ['Composite', 'Carbon', 'Aluminum', 'Polycarbonate', 'ABS', 'Gore-Tex', 'Down', 'Softshell', 'Nylon', 'Merino Wool', 'Polyester']
     countries = ['Austria', 'Germany', 'Italy', 'France', 'Slovenia', 'Czechia', 'Poland', 'Romania', 'China', 'Vietnam']
     
-    def get_price(category):
-        price_ranges = {
-            'Skis': (299, 1099),
-            'Ski Boots': (149, 699),
-            'Ski Poles': (19, 199),
-            'Ski Goggles': (39, 299),
-            'Ski Helmet': (49, 349),
-            'Ski Gloves': (19, 179),
-            'Ski Jacket': (99, 799),
-            'Ski Pants': (79, 599),
-            'Base Layer': (19, 149),
-            'Ski Socks': (5, 39),
-            'Backpack': (39, 249),
-            'Ski Wax': (9, 59),
-            'Bindings': (89, 399),
-            'Avalanche Beacon': (199, 599),
-            'Ski Bag': (29, 199)
-        }
-        min_price, max_price = price_ranges.get(category, (19, 199))
-        return round(random.uniform(min_price, max_price), 2)
-    
-    def get_weight(category):
-        weight_ranges = {
-            'Skis': (3.0, 7.0),
-            'Ski Boots': (1.8, 5.0),
-            'Ski Poles': (0.3, 0.8),
-            'Ski Helmet': (0.4, 0.9),
-            'Ski Jacket': (0.6, 1.6),
-            'Ski Pants': (0.5, 1.4),
-            'Backpack': (0.6, 1.8),
-            'Bindings': (1.0, 2.8),
-            'Avalanche Beacon': (0.2, 0.5)
-        }
-        min_weight, max_weight = weight_ranges.get(category, (0.1, 0.9))
-        return round(random.uniform(min_weight, max_weight), 2)
-    
-    def get_size(category, gender):
-        if category == 'Ski Boots':
-            return f"EU {random.randint(36, 48)}"
-        elif category in ['Ski Helmet', 'Ski Gloves']:
-            return random.choice(['XS', 'S', 'M', 'L', 'XL'])
-        elif category in ['Ski Jacket', 'Ski Pants', 'Base Layer']:
-            return random.choice(['XS', 'S', 'M', 'L', 'XL', 'XXL'])
-        elif category == 'Ski Socks':
-            return random.choice(['S', 'M', 'L'])
-        return ''
-    
-    def get_length(category):
-        if category == 'Skis':
-            return random.randint(140, 190)
-        elif category == 'Ski Poles':
-            return random.randint(90, 140)
-        return ''
-    
-    def generate_sku(brand, category, product_id):
-        brand_code = ''.join([c for c in brand.upper() if c.isalpha()])[:3].ljust(3, 'X')
-        category_code = ''.join([c for c in category.upper() if c.isalpha()])[:3].ljust(3, 'X')
-        return f"SKU-{brand_code}-{category_code}-{product_id}"
-    
-    def generate_barcode():
-        return ''.join([str(random.randint(0, 9)) for _ in range(13)])
-    
-    def get_tags(category):
-        base_tags = ['skiing', 'winter', 'outdoor']
-        category_tags = {
-            'Skis': ['alpine', 'all-mountain', 'carving', 'freeride'],
-            'Ski Boots': ['alpine', 'touring'],
-            'Ski Poles': ['adjustable', 'fixed'],
-            'Ski Goggles': ['mirrored', 'photochromic', 'anti-fog'],
-            'Ski Helmet': ['mips', 'lightweight', 'vented'],
-            'Ski Gloves': ['insulated', 'leather', 'liner'],
-            'Ski Jacket': ['insulated', 'shell', 'gore-tex'],
-            'Ski Pants': ['bib', 'shell', 'insulated'],
-            'Base Layer': ['merino', 'synthetic'],
-            'Ski Socks': ['merino', 'compression'],
-            'Backpack': ['avalanche', 'hydration'],
-            'Ski Wax': ['cold', 'universal', 'warm'],
-            'Bindings': ['gripwalk', 'touring'],
-            'Avalanche Beacon': ['rescue', 'safety'],
-            'Ski Bag': ['roller', 'padded']
-        }
-        specific_tags = category_tags.get(category, [])
-        selected_tags = base_tags + random.sample(specific_tags, min(random.randint(1, 3), len(specific_tags)))
-        return '; '.join(list(set(selected_tags)))
-    
-    # Generate data
-    products = []
-    for product_id in range(1001, 1501):  # 500 products (1001-1500)
-        category = random.choice(categories)
-        brand = random.choice(brands)
-        model = random.choice(models)
-        gender = random.choice(genders)
-        level = random.choice(levels)
-        color = random.choice(colors)
-        
-        product_name = f"{brand} {model} {category}"
-        price = get_price(category)
-        stock = random.randint(0, 250)
-        weight = get_weight(category)
-        size = get_size(category, gender)
-        length = get_length(category)
-        release_year = random.randint(2019, 2025)
-        season = f"AW{random.randint(2021, 2025)}"
-        sku = generate_sku(brand, category, product_id)
-        barcode = generate_barcode()
-        rating = round(3.0 + (2.0 * random.random()), 1)
-        active = random.choices([True, False], weights=[95, 5])[0]
-        discount_percent = random.choices([0, 5, 10, 15, 20, 25, 30], weights=[40, 10, 20, 10, 10, 5, 5])[0]
-        
-        # Generate timestamps
-        created_days_ago = random.randint(0, 900)
-        updated_days_ago = random.randint(0, 90)
-        created_at = (datetime.now() - timedelta(days=created_days_ago)).strftime('%Y-%m-%d %H:%M:%S')
-        updated_at = (datetime.now() - timedelta(days=updated_days_ago)).strftime('%Y-%m-%d %H:%M:%S')
-        
-        product = {
-            'Id': product_id,
-            'ProductName': product_name,
-            'Category': category,
-            'Brand': brand,
-            'Model': model,
-            'Gender': gender,
-            'Level': level,
-            'Color': color,
-            'Size': size,
-            'LengthCm': length if length else None,
-            'Price': price,
-            'Stock': stock,
-            'DiscountPercent': discount_percent,
-            'Rating': rating,
-            'WeightKg': weight,
-            'ReleaseYear': release_year,
-            'Season': season,
-            'WarrantyMonths': random.choice([12, 24, 24, 24, 36]),
-            'Material': random.choice(materials),
-            'CountryOfOrigin': random.choice(countries),
-            'SKU': sku,
-            'Barcode': barcode,
-            'Active': active,
-            'Tags': get_tags(category),
-            'CreatedAt': created_at,
-            'UpdatedAt': updated_at
-        }
-        
-        products.append(product)
+    price_ranges = {
+        'Skis': (299, 1099),
+        'Ski Boots': (149, 699),
+        'Ski Poles': (19, 199),
+        'Ski Goggles': (39, 299),
+        'Ski Helmet': (49, 349),
+        'Ski Gloves': (19, 179),
+        'Ski Jacket': (99, 799),
+        'Ski Pants': (79, 599),
+        'Base Layer': (19, 149),
+        'Ski Socks': (5, 39),
+        'Backpack': (39, 249),
+        'Ski Wax': (9, 59),
+        'Bindings': (89, 399),
+        'Avalanche Beacon': (199, 599),
+        'Ski Bag': (29, 199)
+    }
+    
+    weight_ranges = {
+        'Skis': (3.0, 7.0),
+        'Ski Boots': (1.8, 5.0),
+        'Ski Poles': (0.3, 0.8),
+        'Ski Helmet': (0.4, 0.9),
+        'Ski Jacket': (0.6, 1.6),
+        'Ski Pants': (0.5, 1.4),
+        'Backpack': (0.6, 1.8),
+        'Bindings': (1.0, 2.8),
+        'Avalanche Beacon': (0.2, 0.5)
+    }
+    
+    base_tags = ['skiing', 'winter', 'outdoor']
+    category_tags = {
+        'Skis': ['alpine', 'all-mountain', 'carving', 'freeride'],
+        'Ski Boots': ['alpine', 'touring'],
+        'Ski Poles': ['adjustable', 'fixed'],
+        'Ski Goggles': ['mirrored', 'photochromic', 'anti-fog'],
+        'Ski Helmet': ['mips', 'lightweight', 'vented'],
+        'Ski Gloves': ['insulated', 'leather', 'liner'],
+        'Ski Jacket': ['insulated', 'shell', 'gore-tex'],
+        'Ski Pants': ['bib', 'shell', 'insulated'],
+        'Base Layer': ['merino', 'synthetic'],
+        'Ski Socks': ['merino', 'compression'],
+        'Backpack': ['avalanche', 'hydration'],
+        'Ski Wax': ['cold', 'universal', 'warm'],
+        'Bindings': ['gripwalk', 'touring'],
+        'Avalanche Beacon': ['rescue', 'safety'],
+        'Ski Bag': ['roller', 'padded']
+    }
+    
+    def sku_code(name):
+        return ''.join([c for c in name.upper() if c.isalpha()])[:3].ljust(3, 'X')
+    
+    # Generate data column by column
+    n = 500  # 500 products (1001-1500)
+    ids = np.arange(1001, 1001 + n)
+    
+    cat_idx = rng.integers(0, len(categories), size=n)
+    category = np.array(categories)[cat_idx]
+    brand = rng.choice(brands, size=n)
+    model = rng.choice(models, size=n)
+    gender = rng.choice(genders, size=n)
+    level = rng.choice(levels, size=n)
+    color = rng.choice(colors, size=n)
+    
+    # Per-category bounds looked up once per category, then broadcast to rows
+    price_lo, price_hi = np.array([price_ranges.get(c, (19, 199)) for c in categories]).T
+    weight_lo, weight_hi = np.array([weight_ranges.get(c, (0.1, 0.9)) for c in categories]).T
+    price = np.round(rng.uniform(price_lo[cat_idx], price_hi[cat_idx]), 2)
+    weight = np.round(rng.uniform(weight_lo[cat_idx], weight_hi[cat_idx]), 2)
+    stock = rng.integers(0, 251, size=n)
+    
+    # Category-specific size and length
+    size = np.full(n, '', dtype=object)
+    boots = category == 'Ski Boots'
+    size[boots] = np.char.add('EU ', rng.integers(36, 49, size=boots.sum()).astype(str))
+    small = np.isin(category, ['Ski Helmet', 'Ski Gloves'])
+    size[small] = rng.choice(['XS', 'S', 'M', 'L', 'XL'], size=small.sum())
+    apparel = np.isin(category, ['Ski Jacket', 'Ski Pants', 'Base Layer'])
+    size[apparel] = rng.choice(['XS', 'S', 'M', 'L', 'XL', 'XXL'], size=apparel.sum())
+    socks = category == 'Ski Socks'
+    size[socks] = rng.choice(['S', 'M', 'L'], size=socks.sum())
+    
+    length = np.full(n, np.nan)
+    skis = category == 'Skis'
+    length[skis] = rng.integers(140, 191, size=skis.sum())
+    poles = category == 'Ski Poles'
+    length[poles] = rng.integers(90, 141, size=poles.sum())
+    
+    release_year = rng.integers(2019, 2026, size=n)
+    season = np.char.add('AW', rng.integers(2021, 2026, size=n).astype(str))
+    
+    # SKU codes only depend on the brand/category name
+    brand_codes = {b: sku_code(b) for b in brands}
+    category_codes = {c: sku_code(c) for c in categories}
+    sku = [f"SKU-{brand_codes[b]}-{category_codes[c]}-{i}" for b, c, i in zip(brand, category, ids)]
+    
+    # 13 random digits per row, viewed as one ASCII string each
+    digits = rng.integers(0, 10, size=(n, 13), dtype=np.uint8) + ord('0')
+    barcode = digits.view('S13').ravel().astype(str)
+    
+    rating = np.round(3.0 + 2.0 * rng.random(n), 1)
+    active = rng.random(n) < 0.95
+    discount_percent = rng.choice([0, 5, 10, 15, 20, 25, 30], size=n, p=[0.4, 0.1, 0.2, 0.1, 0.1, 0.05, 0.05])
+    
+    # 1-3 category tags per row: rank each category's tags by a random key and keep the first k
+    tag_count = rng.integers(1, 4, size=n)
+    tag_keys = np.argsort(rng.random((n, max(len(t) for t in category_tags.values()))), axis=1)
+    tags = []
+    for c, k, order in zip(category, tag_count, tag_keys):
+        specific = category_tags.get(c, [])
+        picked = [specific[j] for j in order if j < len(specific)][:k]
+        tags.append('; '.join(base_tags + picked))
+    
+    # Generate timestamps
+    now = np.datetime64(datetime.now(), 's')
+    created_at = now - rng.integers(0, 901, size=n).astype('timedelta64[D]')
+    updated_at = now - rng.integers(0, 91, size=n).astype('timedelta64[D]')
     
     # Create DataFrame
-    df = pd.DataFrame(products)
+    df = pd.DataFrame({
+        'Id': ids,
+        'ProductName': [f"{b} {m} {c}" for b, m, c in zip(brand, model, category)],
+        'Category': category,
+        'Brand': brand,
+        'Model': model,
+        'Gender': gender,
+        'Level': level,
+        'Color': color,
+        'Size': size,
+        'LengthCm': length,
+        'Price': price,
+        'Stock': stock,
+        'DiscountPercent': discount_percent,
+        'Rating': rating,
+        'WeightKg': weight,
+        'ReleaseYear': release_year,
+        'Season': season,
+        'WarrantyMonths': rng.choice([12, 24, 24, 24, 36], size=n),
+        'Material': rng.choice(materials, size=n),
+        'CountryOfOrigin': rng.choice(countries, size=n),
+        'SKU': sku,
+        'Barcode': barcode,
+        'Active': active,
+        'Tags': tags,
+        'CreatedAt': np.char.replace(np.datetime_as_string(created_at, unit='s'), 'T', ' '),
+        'UpdatedAt': np.char.replace(np.datetime_as_string(updated_at, unit='s'), 'T', ' ')
+    })
     
     # Create data directory if it doesn't exist
     data_dir = os.path.join(os.path.dirname(__file__), 'data')
@@ -187,24 +186,19 @@ def generate_ski_products_excel():
     
     # Save to Excel file
     excel_file = os.path.join(data_dir, 'ski_products.xlsx')
-    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+    # Auto-adjust column widths: longest header or value, computed on the DataFrame
+    header_len = pd.Series([len(c) for c in df.columns], index=df.columns)
+    data_len = df.astype(str).apply(lambda s: s.str.len().max())
+    widths = pd.concat([header_len, data_len], axis=1).max(axis=1).clip(upper=48) + 2  # Cap at 50 characters
+    
+    with pd.ExcelWriter(excel_file, engine='xlsxwriter') as writer:
         df.to_excel(writer, sheet_name='Ski Products', index=False)
         
-        # Auto-adjust column widths
         worksheet = writer.sheets['Ski Products']
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-    
-    print(f"Generated Excel file with {len(products)} skiing products: {excel_file}")
+        for i, col in enumerate(df.columns):
+            worksheet.set_column(i, i, widths[col])
+    
+    print(f"Generated Excel file with {len(df)} skiing products: {excel_file}")
     return excel_file
 
 if __name__ == "__main__":
@@ -1,17 +1,23 @@
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 # Base URL of your local API
 BASE_URL = "http://127.0.0.1:8000"
 
+# Shared session so repeated calls reuse the same keep-alive connection
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=0))
+
 def get_products():
     try:
-        response = requests.get(f"{BASE_URL}/products")
+        response = _session.get(f"{BASE_URL}/products")
         response.raise_for_status()  # raises exception for 4xx/5xx
-        products = response.json()
+        products = orjson.loads(response.content)
         print("✅ Products received from API:")
         for p in products:
             print(f"- ID: {p['id']}, Name: {p['name']}, Price: {p['price']}, Stock: {p['stock']}")
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print("❌ Error calling API:", e)
 
 if __name__ == "__main__":
@@ -1,27 +1,129 @@
 import sqlite3
-import pandas as pd
+import numpy as np
 import random
+import shutil
 from datetime import datetime, timedelta
 import os
 
-def create_ski_products_database():
-    # Set seed for reproducible data
-    random.seed(20250929)
-    
-    # Create data directory if it doesn't exist
-    data_dir = os.path.join(os.path.dirname(__file__), 'data')
-    os.makedirs(data_dir, exist_ok=True)
-    
-    # Database file path
-    db_path = os.path.join(data_dir, 'ski_products.db')
-    
-    # Remove existing database
-    if os.path.exists(db_path):
-        os.remove(db_path)
-    
-    # Connect to SQLite database
-    conn = sqlite3.connect(db_path)
+# Reference data shared by every generated database
+CATEGORIES = [
+    ('Skis', 'Alpine and touring skis for all skill levels'),
+    ('Ski Boots', 'Ski boots for alpine and backcountry skiing'),
+    ('Ski Poles', 'Adjustable and fixed ski poles'),
+    ('Ski Goggles', 'Eye protection for skiing'),
+    ('Ski Helmet', 'Head protection for skiing'),
+    ('Ski Gloves', 'Hand protection and warmth'),
+    ('Ski Jacket', 'Outer layer protection'),
+    ('Ski Pants', 'Lower body protection'),
+    ('Base Layer', 'Moisture-wicking underwear'),
+    ('Ski Socks', 'Specialized skiing socks'),
+    ('Backpack', 'Ski touring and day packs'),
+    ('Ski Wax', 'Ski maintenance products'),
+    ('Bindings', 'Ski binding systems'),
+    ('Avalanche Beacon', 'Safety equipment for backcountry'),
+    ('Ski Bag', 'Storage and transport')
+]
+
+BRANDS = [
+    ('Salomon', 'France', 1947),
+    ('Atomic', 'Austria', 1955),
+    ('Rossignol', 'France', 1907),
+    ('Head', 'Austria', 1950),
+    ('Fischer', 'Austria', 1924),
+    ('Nordica', 'Italy', 1939),
+    ('K2', 'USA', 1962),
+    ('Völkl', 'Germany', 1923),
+    ('Blizzard', 'Austria', 1945),
+    ('Dynastar', 'France', 1963),
+    ('Elan', 'Slovenia', 1945),
+    ('Black Crows', 'France', 2006),
+    ('Scarpa', 'Italy', 1938),
+    ('Tecnica', 'Italy', 1960),
+    ('Dalbello', 'Italy', 1974),
+    ('POC', 'Sweden', 2005),
+    ('Giro', 'USA', 1985),
+    ('Smith', 'USA', 1965),
+    ('Oakley', 'USA', 1975),
+    ('Scott', 'Switzerland', 1958)
+]
+
+MATERIALS = [
+    ('Composite', 'Lightweight composite materials'),
+    ('Carbon', 'Carbon fiber construction'),
+    ('Aluminum', 'Aluminum alloy construction'),
+    ('Polycarbonate', 'Impact-resistant plastic'),
+    ('ABS', 'Durable thermoplastic'),
+    ('Gore-Tex', 'Waterproof breathable membrane'),
+    ('Down', 'Natural insulation'),
+    ('Softshell', 'Flexible weather protection'),
+    ('Nylon', 'Durable synthetic fabric'),
+    ('Merino Wool', 'Natural wool fiber'),
+    ('Polyester', 'Synthetic fabric')
+]
+
+MODELS = ['Pro', 'Elite', 'Carbon', 'X', 'X2', 'XR', 'XT', 'Ultra', 'Tour', 'Racer', 'Vantage', 'All-Mountain', 'Backcountry', 'Carver', 'Speed', 'Edge', 'Prime', 'Peak', 'Vector', 'Nova', 'Legend', 'Storm']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+GENDERS = ['Men', 'Women', 'Unisex', 'Kids']
+COLORS = ['Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Orange', 'Grey', 'Navy', 'Teal', 'Burgundy']
+SEASONS = [f"AW{year}" for year in range(2021, 2026)]
+
+BASE_TAGS = ['skiing', 'winter', 'outdoor']
+CATEGORY_TAGS = {
+    'Skis': ['alpine', 'all-mountain', 'carving', 'freeride'],
+    'Ski Boots': ['alpine', 'touring'],
+    'Ski Poles': ['adjustable', 'fixed'],
+    'Ski Goggles': ['mirrored', 'photochromic', 'anti-fog'],
+    'Ski Helmet': ['mips', 'lightweight', 'vented'],
+    'Ski Gloves': ['insulated', 'leather', 'liner'],
+    'Ski Jacket': ['insulated', 'shell', 'gore-tex'],
+    'Ski Pants': ['bib', 'shell', 'insulated'],
+    'Base Layer': ['merino', 'synthetic'],
+    'Ski Socks': ['merino', 'compression'],
+    'Backpack': ['avalanche', 'hydration'],
+    'Ski Wax': ['cold', 'universal', 'warm'],
+    'Bindings': ['gripwalk', 'touring'],
+    'Avalanche Beacon': ['rescue', 'safety'],
+    'Ski Bag': ['roller', 'padded']
+}
+# Sorted so tag ids are the same on every run
+TAGS = sorted(set(BASE_TAGS).union(*CATEGORY_TAGS.values()))
+
+# Bulk-load settings: generated files are rebuilt from scratch, so a crash
+# only costs a rerun. Skips fsyncs, keeps the journal in memory and leaves
+# foreign keys unenforced; they are checked once after the load instead
+BULK_LOAD_PRAGMAS = '''
+    PRAGMA foreign_keys = OFF;
+    PRAGMA journal_mode = MEMORY;
+    PRAGMA synchronous = OFF;
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA locking_mode = EXCLUSIVE;
+'''
+
+# Stored as the template's user_version. Bump it whenever the schema or the
+# reference data above changes so existing templates are rebuilt
+TEMPLATE_VERSION = 3
+
+def template_version(template_path):
+    if not os.path.exists(template_path):
+        return None
+    conn = sqlite3.connect(template_path)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+    finally:
+        conn.close()
+
+def build_reference_template(template_path):
+    # Schema and reference rows without any products. Written under a
+    # temporary name and renamed, so an interrupted build leaves no template
+    tmp_path = template_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
     cursor = conn.cursor()
+    cursor.executescript(BULK_LOAD_PRAGMAS)
+    cursor.execute('BEGIN')
     
     # Create normalized tables
     
@@ -53,17 +155,26 @@ def create_ski_products_database():
         )
     ''')
     
-    # 4. Products table (main table)
+    # 4. Lookup tables for the repeated product attributes
+    for table in ('models', 'genders', 'skill_levels', 'colors', 'seasons'):
+        cursor.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+    
+    # 5. Products table (main table)
     cursor.execute('''
         CREATE TABLE products (
             id INTEGER PRIMARY KEY,
             name TEXT NOT NULL,
             category_id INTEGER NOT NULL,
             brand_id INTEGER NOT NULL,
-            model TEXT NOT NULL,
-            gender TEXT CHECK(gender IN ('Men', 'Women', 'Unisex', 'Kids')),
-            skill_level TEXT CHECK(skill_level IN ('Beginner', 'Intermediate', 'Advanced', 'Expert')),
-            color TEXT,
+            model_id INTEGER,
+            gender_id INTEGER,
+            skill_level_id INTEGER,
+            color_id INTEGER,
             size TEXT,
             length_cm INTEGER,
             weight_kg REAL,
@@ -71,7 +182,7 @@ def create_ski_products_database():
             discount_percent INTEGER DEFAULT 0 CHECK(discount_percent >= 0 AND discount_percent <= 100),
             material_id INTEGER,
             release_year INTEGER,
-            season TEXT,
+            season_id INTEGER,
             warranty_months INTEGER DEFAULT 12,
             sku TEXT UNIQUE NOT NULL,
             barcode TEXT UNIQUE,
@@ -80,15 +191,19 @@ def create_ski_products_database():
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (category_id) REFERENCES categories (id),
             FOREIGN KEY (brand_id) REFERENCES brands (id),
-            FOREIGN KEY (material_id) REFERENCES materials (id)
+            FOREIGN KEY (material_id) REFERENCES materials (id),
+            FOREIGN KEY (model_id) REFERENCES models (id),
+            FOREIGN KEY (gender_id) REFERENCES genders (id),
+            FOREIGN KEY (skill_level_id) REFERENCES skill_levels (id),
+            FOREIGN KEY (color_id) REFERENCES colors (id),
+            FOREIGN KEY (season_id) REFERENCES seasons (id)
         )
     ''')
     
-    # 5. Inventory table
+    # 6. Inventory table (one row per product, keyed by product_id)
     cursor.execute('''
         CREATE TABLE inventory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER NOT NULL,
+            product_id INTEGER PRIMARY KEY,
             stock_quantity INTEGER NOT NULL DEFAULT 0,
             reserved_quantity INTEGER DEFAULT 0,
             reorder_point INTEGER DEFAULT 10,
@@ -97,11 +212,10 @@ def create_ski_products_database():
         )
     ''')
     
-    # 6. Product ratings table
+    # 7. Product ratings table (one row per product, keyed by product_id)
     cursor.execute('''
         CREATE TABLE product_ratings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            product_id INTEGER NOT NULL,
+            product_id INTEGER PRIMARY KEY,
             average_rating REAL CHECK(average_rating >= 1.0 AND average_rating <= 5.0),
             total_reviews INTEGER DEFAULT 0,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -109,7 +223,7 @@ def create_ski_products_database():
         )
     ''')
     
-    # 7. Tags table
+    # 8. Tags table
     cursor.execute('''
         CREATE TABLE tags (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -117,7 +231,7 @@ def create_ski_products_database():
         )
     ''')
     
-    # 8. Product tags junction table (many-to-many)
+    # 9. Product tags junction table (many-to-many)
     cursor.execute('''
         CREATE TABLE product_tags (
             product_id INTEGER,
@@ -125,87 +239,82 @@ def create_ski_products_database():
             PRIMARY KEY (product_id, tag_id),
             FOREIGN KEY (product_id) REFERENCES products (id),
             FOREIGN KEY (tag_id) REFERENCES tags (id)
-        )
+        ) WITHOUT ROWID
     ''')
     
-    # Create indexes for better performance
-    cursor.execute('CREATE INDEX idx_products_category ON products(category_id)')
-    cursor.execute('CREATE INDEX idx_products_brand ON products(brand_id)')
-    cursor.execute('CREATE INDEX idx_products_price ON products(price)')
-    cursor.execute('CREATE INDEX idx_products_active ON products(is_active)')
-    cursor.execute('CREATE INDEX idx_inventory_stock ON inventory(stock_quantity)')
-    
     # Insert reference data
-    categories_data = [
-        ('Skis', 'Alpine and touring skis for all skill levels'),
-        ('Ski Boots', 'Ski boots for alpine and backcountry skiing'),
-        ('Ski Poles', 'Adjustable and fixed ski poles'),
-        ('Ski Goggles', 'Eye protection for skiing'),
-        ('Ski Helmet', 'Head protection for skiing'),
-        ('Ski Gloves', 'Hand protection and warmth'),
-        ('Ski Jacket', 'Outer layer protection'),
-        ('Ski Pants', 'Lower body protection'),
-        ('Base Layer', 'Moisture-wicking underwear'),
-        ('Ski Socks', 'Specialized skiing socks'),
-        ('Backpack', 'Ski touring and day packs'),
-        ('Ski Wax', 'Ski maintenance products'),
-        ('Bindings', 'Ski binding systems'),
-        ('Avalanche Beacon', 'Safety equipment for backcountry'),
-        ('Ski Bag', 'Storage and transport')
-    ]
+    conn.executemany('INSERT INTO categories (name, description) VALUES (?, ?)', CATEGORIES)
+    conn.executemany('INSERT INTO brands (name, country_of_origin, founded_year) VALUES (?, ?, ?)', BRANDS)
+    conn.executemany('INSERT INTO materials (name, properties) VALUES (?, ?)', MATERIALS)
+    for table, names in (('models', MODELS), ('genders', GENDERS), ('skill_levels', LEVELS),
+                         ('colors', COLORS), ('seasons', SEASONS)):
+        conn.executemany(f'INSERT INTO {table} (name) VALUES (?)', [(name,) for name in names])
     
-    brands_data = [
-        ('Salomon', 'France', 1947),
-        ('Atomic', 'Austria', 1955),
-        ('Rossignol', 'France', 1907),
-        ('Head', 'Austria', 1950),
-        ('Fischer', 'Austria', 1924),
-        ('Nordica', 'Italy', 1939),
-        ('K2', 'USA', 1962),
-        ('Völkl', 'Germany', 1923),
-        ('Blizzard', 'Austria', 1945),
-        ('Dynastar', 'France', 1963),
-        ('Elan', 'Slovenia', 1945),
-        ('Black Crows', 'France', 2006),
-        ('Scarpa', 'Italy', 1938),
-        ('Tecnica', 'Italy', 1960),
-        ('Dalbello', 'Italy', 1974),
-        ('POC', 'Sweden', 2005),
-        ('Giro', 'USA', 1985),
-        ('Smith', 'USA', 1965),
-        ('Oakley', 'USA', 1975),
-        ('Scott', 'Switzerland', 1958)
-    ]
+    # Insert all tags
+    conn.executemany('INSERT INTO tags (name) VALUES (?)', [(tag,) for tag in TAGS])
     
-    materials_data = [
-        ('Composite', 'Lightweight composite materials'),
-        ('Carbon', 'Carbon fiber construction'),
-        ('Aluminum', 'Aluminum alloy construction'),
-        ('Polycarbonate', 'Impact-resistant plastic'),
-        ('ABS', 'Durable thermoplastic'),
-        ('Gore-Tex', 'Waterproof breathable membrane'),
-        ('Down', 'Natural insulation'),
-        ('Softshell', 'Flexible weather protection'),
-        ('Nylon', 'Durable synthetic fabric'),
-        ('Merino Wool', 'Natural wool fiber'),
-        ('Polyester', 'Synthetic fabric')
-    ]
+    cursor.execute(f'PRAGMA user_version = {TEMPLATE_VERSION}')
+    cursor.execute('COMMIT')
+    conn.close()
+    os.replace(tmp_path, template_path)
+
+def remove_sidecars(db_path):
+    # WAL, shared-memory and rollback journal files belong to the file they
+    # were written for; left next to a new file, SQLite would replay them onto it
+    for suffix in ('-wal', '-shm', '-journal'):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+
+def create_ski_products_database(db_path=None):
+    # Seeded generators for reproducible data; local instances so the global
+    # random state of the importing process is left alone
+    py_rng = random.Random(20250929)
+    rng = np.random.default_rng(20250929)
     
-    # Insert reference data
-    cursor.executemany('INSERT INTO categories (name, description) VALUES (?, ?)', categories_data)
-    cursor.executemany('INSERT INTO brands (name, country_of_origin, founded_year) VALUES (?, ?, ?)', brands_data)
-    cursor.executemany('INSERT INTO materials (name, properties) VALUES (?, ?)', materials_data)
+    # Database file path, data/ski_products.db by default
+    if db_path is None:
+        db_path = os.path.join(os.path.dirname(__file__), 'data', 'ski_products.db')
     
-    # Get reference data for foreign keys
-    categories_dict = {row[1]: row[0] for row in cursor.execute('SELECT id, name FROM categories').fetchall()}
-    brands_dict = {row[1]: row[0] for row in cursor.execute('SELECT id, name FROM brands').fetchall()}
-    materials_dict = {row[1]: row[0] for row in cursor.execute('SELECT id, name FROM materials').fetchall()}
+    # Create data directory if it doesn't exist
+    data_dir = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(data_dir, exist_ok=True)
     
-    # Generate and insert products
-    models = ['Pro', 'Elite', 'Carbon', 'X', 'X2', 'XR', 'XT', 'Ultra', 'Tour', 'Racer', 'Vantage', 'All-Mountain', 'Backcountry', 'Carver', 'Speed', 'Edge', 'Prime', 'Peak', 'Vector', 'Nova', 'Legend', 'Storm']
-    levels = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
-    genders = ['Men', 'Women', 'Unisex', 'Kids']
-    colors = ['Black', 'White', 'Red', 'Blue', 'Green', 'Yellow', 'Orange', 'Grey', 'Navy', 'Teal', 'Burgundy']
+    # Schema and reference data come from a template file that is built once
+    # and copied, so each run only generates the product rows
+    template_path = os.path.join(data_dir, 'ski_products_template.db')
+    if template_version(template_path) != TEMPLATE_VERSION:
+        build_reference_template(template_path)
+    
+    # Build into a copy of the template next to the target. The live file is
+    # only swapped out once the build has committed, so readers such as the
+    # API never see a half-built database
+    build_path = db_path + '.tmp'
+    remove_sidecars(build_path)
+    shutil.copyfile(template_path, build_path)
+    
+    # Connect to SQLite database (autocommit mode; the transaction is managed explicitly)
+    conn = sqlite3.connect(build_path, isolation_level=None)
+    cursor = conn.cursor()
+    cursor.executescript(BULK_LOAD_PRAGMAS)
+    
+    # Load all products in one transaction so it is written to disk once
+    cursor.execute('BEGIN')
+    
+    # Ids for reference data. The template inserts each list in order into
+    # empty AUTOINCREMENT tables, so ids are list positions starting at 1
+    def ids_by_name(names):
+        return {name: i for i, name in enumerate(names, start=1)}
+    categories_dict = ids_by_name([row[0] for row in CATEGORIES])
+    brands_dict = ids_by_name([row[0] for row in BRANDS])
+    materials_dict = ids_by_name([row[0] for row in MATERIALS])
+    tags_dict = ids_by_name(TAGS)
+    models_dict = ids_by_name(MODELS)
+    genders_dict = ids_by_name(GENDERS)
+    levels_dict = ids_by_name(LEVELS)
+    colors_dict = ids_by_name(COLORS)
+    seasons_dict = ids_by_name(SEASONS)
     
     # Price ranges by category
     price_ranges = {
@@ -216,184 +325,211 @@ def create_ski_products_database():
         'Bindings': (89, 399), 'Avalanche Beacon': (199, 599), 'Ski Bag': (29, 199)
     }
     
-    # Insert products
-    for product_id in range(1001, 1501):  # 500 products
-        category_name = random.choice(list(categories_dict.keys()))
-        brand_name = random.choice(list(brands_dict.keys()))
-        material_name = random.choice(list(materials_dict.keys()))
-        
-        category_id = categories_dict[category_name]
-        brand_id = brands_dict[brand_name]
-        material_id = materials_dict[material_name]
-        
-        model = random.choice(models)
-        gender = random.choice(genders)
-        level = random.choice(levels)
-        color = random.choice(colors)
-        
-        product_name = f"{brand_name} {model} {category_name}"
-        
-        # Generate category-specific attributes
-        min_price, max_price = price_ranges.get(category_name, (19, 199))
-        price = round(random.uniform(min_price, max_price), 2)
-        
-        # Size logic
-        size = ''
-        if category_name == 'Ski Boots':
-            size = f"EU {random.randint(36, 48)}"
-        elif category_name in ['Ski Helmet', 'Ski Gloves']:
-            size = random.choice(['XS', 'S', 'M', 'L', 'XL'])
-        elif category_name in ['Ski Jacket', 'Ski Pants', 'Base Layer']:
-            size = random.choice(['XS', 'S', 'M', 'L', 'XL', 'XXL'])
-        elif category_name == 'Ski Socks':
-            size = random.choice(['S', 'M', 'L'])
-        
-        # Length for skis and poles
-        length_cm = None
-        if category_name == 'Skis':
-            length_cm = random.randint(140, 190)
-        elif category_name == 'Ski Poles':
-            length_cm = random.randint(90, 140)
-        
-        # Weight ranges
-        weight_ranges = {
-            'Skis': (3.0, 7.0), 'Ski Boots': (1.8, 5.0), 'Ski Poles': (0.3, 0.8),
-            'Ski Helmet': (0.4, 0.9), 'Ski Jacket': (0.6, 1.6), 'Ski Pants': (0.5, 1.4),
-            'Backpack': (0.6, 1.8), 'Bindings': (1.0, 2.8), 'Avalanche Beacon': (0.2, 0.5)
-        }
-        min_weight, max_weight = weight_ranges.get(category_name, (0.1, 0.9))
-        weight_kg = round(random.uniform(min_weight, max_weight), 2)
-        
-        # Generate other attributes
-        discount_percent = random.choices([0, 5, 10, 15, 20, 25, 30], weights=[40, 10, 20, 10, 10, 5, 5])[0]
-        release_year = random.randint(2019, 2025)
-        season = f"AW{random.randint(2021, 2025)}"
-        warranty_months = random.choice([12, 24, 24, 24, 36])
-        
-        # Generate SKU and barcode
-        brand_code = ''.join([c for c in brand_name.upper() if c.isalpha()])[:3].ljust(3, 'X')
-        category_code = ''.join([c for c in category_name.upper() if c.isalpha()])[:3].ljust(3, 'X')
-        sku = f"SKU-{brand_code}-{category_code}-{product_id}"
-        barcode = ''.join([str(random.randint(0, 9)) for _ in range(13)])
-        
-        is_active = random.choices([1, 0], weights=[95, 5])[0]
-        
-        # Insert product
-        cursor.execute('''
-            INSERT INTO products (
-                id, name, category_id, brand_id, model, gender, skill_level, color, size,
-                length_cm, weight_kg, price, discount_percent, material_id, release_year,
-                season, warranty_months, sku, barcode, is_active
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            product_id, product_name, category_id, brand_id, model, gender, level, color, size,
-            length_cm, weight_kg, price, discount_percent, material_id, release_year,
-            season, warranty_months, sku, barcode, is_active
-        ))
-        
-        # Insert inventory
-        stock_quantity = random.randint(0, 250)
-        reserved_quantity = random.randint(0, min(stock_quantity, 20))
-        reorder_point = random.randint(5, 50)
-        
-        cursor.execute('''
-            INSERT INTO inventory (product_id, stock_quantity, reserved_quantity, reorder_point)
-            VALUES (?, ?, ?, ?)
-        ''', (product_id, stock_quantity, reserved_quantity, reorder_point))
-        
-        # Insert rating
-        rating = round(3.0 + (2.0 * random.random()), 1)
-        total_reviews = random.randint(0, 150)
-        
-        cursor.execute('''
-            INSERT INTO product_ratings (product_id, average_rating, total_reviews)
-            VALUES (?, ?, ?)
-        ''', (product_id, rating, total_reviews))
-    
-    # Insert tags and product-tag relationships
-    all_tags = set()
-    category_tags = {
-        'Skis': ['alpine', 'all-mountain', 'carving', 'freeride'],
-        'Ski Boots': ['alpine', 'touring'],
-        'Ski Poles': ['adjustable', 'fixed'],
-        'Ski Goggles': ['mirrored', 'photochromic', 'anti-fog'],
-        'Ski Helmet': ['mips', 'lightweight', 'vented'],
-        'Ski Gloves': ['insulated', 'leather', 'liner'],
-        'Ski Jacket': ['insulated', 'shell', 'gore-tex'],
-        'Ski Pants': ['bib', 'shell', 'insulated'],
-        'Base Layer': ['merino', 'synthetic'],
-        'Ski Socks': ['merino', 'compression'],
-        'Backpack': ['avalanche', 'hydration'],
-        'Ski Wax': ['cold', 'universal', 'warm'],
-        'Bindings': ['gripwalk', 'touring'],
-        'Avalanche Beacon': ['rescue', 'safety'],
-        'Ski Bag': ['roller', 'padded']
+    # Weight ranges
+    weight_ranges = {
+        'Skis': (3.0, 7.0), 'Ski Boots': (1.8, 5.0), 'Ski Poles': (0.3, 0.8),
+        'Ski Helmet': (0.4, 0.9), 'Ski Jacket': (0.6, 1.6), 'Ski Pants': (0.5, 1.4),
+        'Backpack': (0.6, 1.8), 'Bindings': (1.0, 2.8), 'Avalanche Beacon': (0.2, 0.5)
     }
     
-    base_tags = ['skiing', 'winter', 'outdoor']
-    all_tags.update(base_tags)
-    for tags_list in category_tags.values():
-        all_tags.update(tags_list)
+    # Size options by category group
+    accessory_sizes = ['XS', 'S', 'M', 'L', 'XL']
+    apparel_sizes = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+    sock_sizes = ['S', 'M', 'L']
+    
+    # Generate the product columns in one pass with NumPy
+    n = 500
+    product_ids = np.arange(1001, 1001 + n)
+    category_names = list(categories_dict.keys())
+    brand_names = list(brands_dict.keys())
+    material_names = list(materials_dict.keys())
+    
+    # Map drawn positions in a name list to that lookup table's ids
+    def lookup_ids(names, ids_by_name, idx):
+        return np.array([ids_by_name[name] for name in names])[idx]
+    
+    cat_idx = rng.integers(0, len(category_names), size=n)
+    brand_idx = rng.integers(0, len(brand_names), size=n)
+    material_idx = rng.integers(0, len(material_names), size=n)
+    model_idx = rng.integers(0, len(MODELS), size=n)
+    gender_idx = rng.integers(0, len(GENDERS), size=n)
+    level_idx = rng.integers(0, len(LEVELS), size=n)
+    color_idx = rng.integers(0, len(COLORS), size=n)
+    
+    category = np.array(category_names)[cat_idx]
+    brand = np.array(brand_names)[brand_idx]
+    model = np.array(MODELS)[model_idx]
+    
+    category_id = lookup_ids(category_names, categories_dict, cat_idx)
+    brand_id = lookup_ids(brand_names, brands_dict, brand_idx)
+    material_id = lookup_ids(material_names, materials_dict, material_idx)
+    model_id = lookup_ids(MODELS, models_dict, model_idx)
+    gender_id = lookup_ids(GENDERS, genders_dict, gender_idx)
+    level_id = lookup_ids(LEVELS, levels_dict, level_idx)
+    color_id = lookup_ids(COLORS, colors_dict, color_idx)
+    product_name = [f"{b} {m} {c}" for b, m, c in zip(brand.tolist(), model.tolist(), category.tolist())]
+    
+    price_lo, price_hi = np.array([price_ranges.get(c, (19, 199)) for c in category_names]).T
+    price = np.round(rng.uniform(price_lo[cat_idx], price_hi[cat_idx]), 2)
+    
+    discount_percent = rng.choice([0, 5, 10, 15, 20, 25, 30], size=n, p=[0.4, 0.1, 0.2, 0.1, 0.1, 0.05, 0.05])
+    release_year = rng.integers(2019, 2026, size=n)
+    season_id = lookup_ids(SEASONS, seasons_dict, rng.integers(0, len(SEASONS), size=n))
+    warranty_months = rng.choice([12, 24, 24, 24, 36], size=n)
+    is_active = rng.choice([1, 0], size=n, p=[0.95, 0.05])
+    
+    # 13 random digits per row, viewed as one ASCII string each
+    digits = rng.integers(0, 10, size=(n, 13), dtype=np.uint8) + ord('0')
+    barcode = digits.view('S13').ravel().astype(str)
+    
+    # SKU codes: first three letters of the brand and category name
+    def sku_code(name):
+        return ''.join([c for c in name.upper() if c.isalpha()])[:3].ljust(3, 'X')
+    brand_codes = {b: sku_code(b) for b in brand_names}
+    category_codes = {c: sku_code(c) for c in category_names}
+    
+    skus = [
+        f"SKU-{brand_codes[b]}-{category_codes[c]}-{i}"
+        for i, b, c in zip(product_ids.tolist(), brand.tolist(), category.tolist())
+    ]
     
-    # Insert all tags
-    for tag in all_tags:
-        cursor.execute('INSERT INTO tags (name) VALUES (?)', (tag,))
-    
-    # Get tag IDs
-    tags_dict = {row[1]: row[0] for row in cursor.execute('SELECT id, name FROM tags').fetchall()}
-    
-    # Add tags to products
-    products = cursor.execute('SELECT id, category_id FROM products').fetchall()
-    for product_id, category_id in products:
-        category_name = next(name for name, id in categories_dict.items() if id == category_id)
-        
-        # Add base tags
-        for tag in base_tags:
-            cursor.execute('INSERT INTO product_tags (product_id, tag_id) VALUES (?, ?)',
-                         (product_id, tags_dict[tag]))
-        
-        # Add category-specific tags
-        if category_name in category_tags:
-            specific_tags = random.sample(category_tags[category_name], 
-                                        min(random.randint(1, 3), len(category_tags[category_name])))
-            for tag in specific_tags:
-                cursor.execute('INSERT INTO product_tags (product_id, tag_id) VALUES (?, ?)',
-                             (product_id, tags_dict[tag]))
+    # Category-specific size, length and weight, drawn per category mask
+    size = np.full(n, '', dtype=object)
+    boots = category == 'Ski Boots'
+    size[boots] = [f"EU {x}" for x in rng.integers(36, 49, size=boots.sum()).tolist()]
+    small = np.isin(category, ['Ski Helmet', 'Ski Gloves'])
+    size[small] = rng.choice(accessory_sizes, size=small.sum()).tolist()
+    apparel = np.isin(category, ['Ski Jacket', 'Ski Pants', 'Base Layer'])
+    size[apparel] = rng.choice(apparel_sizes, size=apparel.sum()).tolist()
+    socks = category == 'Ski Socks'
+    size[socks] = rng.choice(sock_sizes, size=socks.sum()).tolist()
+    
+    length_cm = np.full(n, None, dtype=object)
+    skis = category == 'Skis'
+    length_cm[skis] = rng.integers(140, 191, size=skis.sum()).tolist()
+    poles = category == 'Ski Poles'
+    length_cm[poles] = rng.integers(90, 141, size=poles.sum()).tolist()
+    
+    weight_lo, weight_hi = np.array([weight_ranges.get(c, (0.1, 0.9)) for c in category_names]).T
+    weight_kg = np.round(rng.uniform(weight_lo[cat_idx], weight_hi[cat_idx]), 2)
+    
+    products_rows = list(zip(
+        product_ids.tolist(), product_name, category_id.tolist(), brand_id.tolist(),
+        model_id.tolist(), gender_id.tolist(), level_id.tolist(), color_id.tolist(), size.tolist(),
+        length_cm.tolist(), weight_kg.tolist(), price.tolist(), discount_percent.tolist(), material_id.tolist(),
+        release_year.tolist(), season_id.tolist(), warranty_months.tolist(), skus, barcode.tolist(),
+        is_active.tolist()
+    ))
+    
+    # Inventory
+    stock_quantity = rng.integers(0, 251, size=n)
+    reserved_quantity = rng.integers(0, np.minimum(stock_quantity, 20) + 1)
+    reorder_point = rng.integers(5, 51, size=n)
+    inventory_rows = list(zip(
+        product_ids.tolist(), stock_quantity.tolist(), reserved_quantity.tolist(), reorder_point.tolist()
+    ))
+    
+    # Rating
+    rating = np.round(3.0 + 2.0 * rng.random(n), 1)
+    total_reviews = rng.integers(0, 151, size=n)
+    rating_rows = list(zip(product_ids.tolist(), rating.tolist(), total_reviews.tolist()))
+    
+    # Insert products, inventory and ratings
+    conn.executemany('''
+        INSERT INTO products (
+            id, name, category_id, brand_id, model_id, gender_id, skill_level_id, color_id, size,
+            length_cm, weight_kg, price, discount_percent, material_id, release_year,
+            season_id, warranty_months, sku, barcode, is_active
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', products_rows)
+    conn.executemany('''
+        INSERT INTO inventory (product_id, stock_quantity, reserved_quantity, reorder_point)
+        VALUES (?, ?, ?, ?)
+    ''', inventory_rows)
+    conn.executemany('''
+        INSERT INTO product_ratings (product_id, average_rating, total_reviews)
+        VALUES (?, ?, ?)
+    ''', rating_rows)
+    
+    # Every product gets the base tags; one set-based insert in SQLite
+    base_qmarks = ','.join(['?'] * len(BASE_TAGS))
+    cursor.execute(f'''
+        INSERT INTO product_tags (product_id, tag_id)
+        SELECT p.id, t.id
+        FROM products p
+        CROSS JOIN tags t
+        WHERE t.name IN ({base_qmarks})
+    ''', BASE_TAGS)
+    
+    # Add 1-3 category-specific tags, reusing the categories picked during generation
+    category_tag_ids = {name: [tags_dict[tag] for tag in tags_list] for name, tags_list in CATEGORY_TAGS.items()}
+    product_tag_rows = []
+    for product_id, category_name in zip(product_ids.tolist(), category.tolist()):
+        tag_ids = category_tag_ids.get(category_name)
+        if tag_ids:
+            for tag_id in py_rng.sample(tag_ids, min(py_rng.randint(1, 3), len(tag_ids))):
+                product_tag_rows.append((product_id, tag_id))
+    
+    conn.executemany('INSERT INTO product_tags (product_id, tag_id) VALUES (?, ?)', product_tag_rows)
+    
+    # Check every foreign key once, instead of per insert
+    violations = cursor.execute('PRAGMA foreign_key_check').fetchall()
+    if violations:
+        cursor.execute('ROLLBACK')
+        conn.close()
+        os.remove(build_path)
+        raise sqlite3.IntegrityError(
+            f"Foreign key check failed for {len(violations)} rows (first: {violations[0]})"
+        )
+    
+    # Create indexes once the data is loaded, instead of updating them per insert
+    cursor.execute('CREATE INDEX idx_products_category ON products(category_id)')
+    cursor.execute('CREATE INDEX idx_products_brand ON products(brand_id)')
+    cursor.execute('CREATE INDEX idx_products_price ON products(price)')
+    cursor.execute('CREATE INDEX idx_products_active ON products(is_active)')
+    cursor.execute('CREATE INDEX idx_inventory_stock ON inventory(stock_quantity)')
+    cursor.execute('CREATE INDEX idx_product_tags_tag ON product_tags(tag_id)')
     
     # Commit all changes
-    conn.commit()
+    cursor.execute('COMMIT')
+    conn.close()
+    
+    # Swap the new file in. The old file's sidecars go first: a WAL left by
+    # connections to the old file must not be paired with the new one
+    remove_sidecars(db_path)
+    os.replace(build_path, db_path)
     
     print(f"Database created successfully: {db_path}")
-    print(f"Tables created: categories, brands, materials, products, inventory, product_ratings, tags, product_tags")
+    print(f"Tables created: categories, brands, materials, models, genders, skill_levels, colors, seasons, products, inventory, product_ratings, tags, product_tags")
     print(f"Generated 500 products with normalized relational structure")
     
-    # Show some example queries
+    # Show some example queries (pandas is only needed here)
+    import pandas as pd
+    conn = sqlite3.connect(db_path)
     print("\n--- Example Queries ---")
     
     # Count products by category
     print("\nProducts by category:")
-    cursor.execute('''
+    category_counts = pd.read_sql('''
         SELECT c.name, COUNT(p.id) as product_count
         FROM categories c
         LEFT JOIN products p ON c.id = p.category_id
         GROUP BY c.name
         ORDER BY product_count DESC
-    ''')
-    for row in cursor.fetchall():
-        print(f"  {row[0]}: {row[1]} products")
+    ''', conn)
+    print(category_counts.to_string(index=False))
     
     # Average price by brand
     print("\nTop 5 brands by average price:")
-    cursor.execute('''
+    brand_prices = pd.read_sql('''
         SELECT b.name, ROUND(AVG(p.price), 2) as avg_price
         FROM brands b
         JOIN products p ON b.id = p.brand_id
         GROUP BY b.name
         ORDER BY avg_price DESC
         LIMIT 5
-    ''')
-    for row in cursor.fetchall():
-        print(f"  {row[0]}: ${row[1]}")
+    ''', conn)
+    print(brand_prices.to_string(index=False))
     
     conn.close()
     return db_path
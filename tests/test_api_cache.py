@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+import apicalls
+from sqllite_db import create_ski_products_database
+
+
+class ApiCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmp.name, "ski_products.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_ski_products_database(cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.old_path = apicalls.DB_PATH
+        apicalls.DB_PATH = self.db_path
+        apicalls._cache.clear()
+
+    def tearDown(self):
+        apicalls.DB_PATH = self.old_path
+        apicalls._cache.clear()
+
+    def test_load_racing_a_change_is_not_cached(self):
+        load = apicalls.load_all_products
+
+        def load_during_change():
+            entry = load()
+            # Another request noticed a database change while this load ran
+            apicalls._cache_signature = None
+            return entry
+
+        with TestClient(apicalls.app) as client:
+            apicalls._cache.clear()
+            apicalls.load_all_products = load_during_change
+            try:
+                self.assertEqual(client.get("/products").status_code, 200)
+            finally:
+                apicalls.load_all_products = load
+            self.assertNotIn(apicalls.ALL_PRODUCTS_KEY, apicalls._cache)
+
+            self.assertEqual(client.get("/products").status_code, 200)
+            self.assertIn(apicalls.ALL_PRODUCTS_KEY, apicalls._cache)
+
+    def test_if_none_match(self):
+        with TestClient(apicalls.app) as client:
+            etag = client.get("/products").headers["etag"]
+            for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+                response = client.get("/products", headers={"If-None-Match": header})
+                self.assertEqual(response.status_code, 304, header)
+                self.assertEqual(response.headers["etag"], etag)
+            response = client.get("/products", headers={"If-None-Match": '"other"'})
+            self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from excelTosql import active_flags, sheet_column
+
+
+class ActiveFlagsTest(unittest.TestCase):
+    def check(self, values, expected):
+        flags = active_flags(values)
+        self.assertEqual(flags.tolist(), expected)
+        self.assertEqual(flags.dtype, "int64")
+
+    def test_int(self):
+        self.check(pd.Series([1, 0]), [1, 0])
+
+    def test_float_with_nan(self):
+        self.check(pd.Series([1.0, np.nan, 0.0]), [1, 1, 0])
+
+    def test_bool(self):
+        self.check(pd.Series([True, False]), [1, 0])
+
+    def test_str(self):
+        self.check(pd.Series([" Yes", "no", "TRUE", "0", None]), [1, 0, 1, 0, 1])
+
+    def test_mixed(self):
+        self.check(pd.Series(["y", 0, np.nan, 2], dtype=object), [1, 0, 1, 1])
+
+    def test_absent_column(self):
+        df = pd.DataFrame({"Id": [1, 2]})
+        self.check(sheet_column(df, "Active"), [1, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import contextlib
+import gc
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+import apicalls
+from sqllite_db import create_ski_products_database
+
+
+class RegenerateWithPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "ski_products.db")
+        self.generate()
+        self.old_path = apicalls.DB_PATH
+        apicalls.DB_PATH = self.db_path
+        apicalls._cache.clear()
+
+    def tearDown(self):
+        apicalls.DB_PATH = self.old_path
+        apicalls._cache.clear()
+        self.tmp.cleanup()
+
+    def generate(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_ski_products_database(self.db_path)
+
+    def rename(self, product_id, name):
+        with apicalls.acquire() as conn:
+            conn.execute("UPDATE products SET name = ? WHERE id = ?", (name, product_id))
+            conn.commit()
+
+    def test_regenerate_while_pool_is_open(self):
+        with TestClient(apicalls.app) as client:
+            product_id = client.get("/products").json()[0]["id"]
+            url = f"/products/{product_id}"
+            self.assertEqual(client.get(url).status_code, 200)
+            # Leaves frames in the old file's WAL
+            self.rename(product_id, "stale")
+
+            self.generate()
+            self.assertFalse(os.path.exists(self.db_path + ".tmp"))
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.json()["name"], "stale")
+
+            # Frames in the new file's WAL must survive the old pool closing
+            self.rename(product_id, "fresh")
+            gc.collect()
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone(), ("ok",))
+            self.assertEqual(conn.execute("SELECT name FROM products WHERE id = ?", (product_id,)).fetchone(), ("fresh",))
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()